@@ -1,19 +1,34 @@
 from dash import Dash
 from flask import send_from_directory
 
+from .admin import register_admin_routes
 from .callbacks import register_callbacks
-from .config import ASSETS_DIR, FONT_DIR
-from .figures import default_trend_fig, default_world_map_fig
+from .config import (
+    ASSETS_DIR,
+    DATA_FILE,
+    DATA_WATCH_INTERVAL_SECONDS,
+    FONT_DIR,
+    PROFILE_MEMORY,
+    WATCH_DATA_FILE,
+)
+from .data import current_snapshot, start_data_watcher
 from .layout import build_layout
+from .profiling import enable_memory_profiling
 
 
-def create_app():
-    world_map_fig = default_world_map_fig()
-    trend_chart_fig = default_trend_fig()
+def serve_layout():
+    return build_layout(current_snapshot())
 
+
+def create_app(watch_data=WATCH_DATA_FILE, profile_memory=PROFILE_MEMORY):
     app = Dash(__name__, assets_folder=str(ASSETS_DIR))
-    app.layout = build_layout(world_map_fig, trend_chart_fig)
+    app.layout = serve_layout
     register_callbacks(app)
+    register_admin_routes(app)
+    if watch_data:
+        start_data_watcher(DATA_FILE, DATA_WATCH_INTERVAL_SECONDS)
+    if profile_memory:
+        enable_memory_profiling(app)
 
     @app.server.route("/fonts/<path:filename>")
     def serve_font(filename):
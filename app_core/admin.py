@@ -0,0 +1,68 @@
+import hmac
+from functools import wraps
+
+from flask import abort, jsonify, request
+
+from .config import ADMIN_TOKEN
+from .data import current_snapshot, last_reload_error, reload_snapshot_async
+from .profiling import is_enabled, memory_report, reset_baseline
+
+MEMORY_GROUPINGS = {"lineno", "filename", "traceback"}
+
+
+def require_admin(view):
+    @wraps(view)
+    def guarded(*args, **kwargs):
+        supplied = request.headers.get("Authorization", "")
+        if supplied.startswith("Bearer "):
+            supplied = supplied[len("Bearer "):]
+        if not ADMIN_TOKEN or not hmac.compare_digest(supplied, ADMIN_TOKEN):
+            abort(403)
+        return view(*args, **kwargs)
+
+    return guarded
+
+
+def snapshot_status(snapshot):
+    return {
+        "version": snapshot.version,
+        "loaded_at": snapshot.loaded_at,
+        "rows": len(snapshot.map_df),
+        "years": [snapshot.min_year, snapshot.max_year],
+        "last_reload_error": last_reload_error(),
+    }
+
+
+def register_admin_routes(app):
+    # no token, no admin routes: a loopback check is meaningless behind a same-host reverse proxy
+    if not ADMIN_TOKEN:
+        return
+    server = app.server
+
+    @server.route("/admin/data", methods=["GET"])
+    @require_admin
+    def data_status():
+        return jsonify(snapshot_status(current_snapshot()))
+
+    @server.route("/admin/data/reload", methods=["POST"])
+    @require_admin
+    def trigger_data_reload():
+        started = reload_snapshot_async()
+        return jsonify({"reloading": True, "coalesced": not started, **snapshot_status(current_snapshot())}), 202
+
+    @server.route("/admin/memory", methods=["GET"])
+    @require_admin
+    def memory_status():
+        limit = request.args.get("limit", default=20, type=int)
+        group_by = request.args.get("group_by", default="lineno")
+        if group_by not in MEMORY_GROUPINGS:
+            abort(400)
+        return jsonify(memory_report(limit=max(1, limit), group_by=group_by))
+
+    @server.route("/admin/memory/baseline", methods=["POST"])
+    @require_admin
+    def memory_baseline():
+        if not is_enabled():
+            abort(409)
+        reset_baseline()
+        return jsonify({"baseline_reset": True})
@@ -1,25 +1,87 @@
-from dash import Input, Output, State, ctx
+from dash import Input, Output, State, ctx, no_update
 from dash.exceptions import PreventUpdate
 
 from .components import build_summary_card
-from .data import df, map_df
-from .figures import make_trend_chart, make_world_map
+from .data import current_snapshot
+from .figures import make_country_timeline, make_trend_chart, make_world_map
 from .helpers import (
     apply_multi_filter,
+    clamp_year,
     compute_stage,
+    country_timeline,
     extract_summary_row,
     resolve_ideologies,
     resolve_regions,
+    resolve_year_pair,
+    resolve_year_window,
 )
+from .layout import slider_bounds
 
 
 def register_callbacks(app):
-    @app.callback(Output("year_confirmed", "data"), Input("year_slider", "value"))
-    def flag_year_confirmation(selected_year):  # pylint: disable=unused-argument
+    @app.callback(
+        Output("year_confirmed", "data"),
+        Input("year_slider", "value"),
+        Input("year_range_slider", "value"),
+        Input("data_version", "data"),
+    )
+    def flag_year_confirmation(selected_year, selected_range, loaded_version):  # pylint: disable=unused-argument
         if ctx.triggered_id is None:
             return False
+        # slider values clamped by sync_data_version arrive together with the new version
+        if "data_version.data" in ctx.triggered_prop_ids:
+            return no_update
         return True
 
+    @app.callback(
+        Output("year_slider_container", "style"),
+        Output("year_range_container", "style"),
+        Input("year_mode", "value"),
+    )
+    def toggle_year_range_mode(year_mode):
+        if year_mode in {"range", "compare"}:
+            return {"flex": "1 1 auto", "display": "none"}, {"flex": "1 1 auto"}
+        return {"flex": "1 1 auto"}, {"flex": "1 1 auto", "display": "none"}
+
+    @app.callback(
+        Output("data_version", "data"),
+        Output("year_slider", "min"),
+        Output("year_slider", "max"),
+        Output("year_slider", "marks"),
+        Output("year_slider", "value"),
+        Output("year_range_slider", "min"),
+        Output("year_range_slider", "max"),
+        Output("year_range_slider", "marks"),
+        Output("year_range_slider", "value"),
+        Input("data_version_poll", "n_intervals"),
+        State("data_version", "data"),
+        State("year_slider", "value"),
+        State("year_range_slider", "value"),
+        prevent_initial_call=True,
+    )
+    def sync_data_version(poll_count, loaded_version, selected_year, selected_range):  # pylint: disable=unused-argument
+        snapshot = current_snapshot()
+        if snapshot.version == loaded_version:
+            raise PreventUpdate
+        slider_min, slider_max, year_marks = slider_bounds(snapshot)
+        year_value = clamp_year(selected_year, slider_min, slider_max, fallback=slider_max)
+        range_value = [
+            clamp_year(year, slider_min, slider_max, fallback=default)
+            for year, default in zip(selected_range or [None, None], (slider_min, slider_max))
+        ]
+        range_value = sorted(range_value)
+        return (
+            snapshot.version,
+            slider_min,
+            slider_max,
+            year_marks,
+            year_value if year_value != selected_year else no_update,
+            slider_min,
+            slider_max,
+            year_marks,
+            range_value if range_value != selected_range else no_update,
+        )
+
     @app.callback(
         Output("info_overlay", "className"),
         Input("info_button", "n_clicks"),
@@ -42,9 +104,11 @@ def register_callbacks(app):
         Input("summary_close", "n_clicks"),
         Input("summary_backdrop", "n_clicks"),
         State("year_slider", "value"),
+        State("year_mode", "value"),
+        State("year_range_slider", "value"),
         prevent_initial_call=True,
     )
-    def toggle_summary_modal(click_data, close_clicks, backdrop_clicks, selected_year):  # pylint: disable=unused-argument
+    def toggle_summary_modal(click_data, close_clicks, backdrop_clicks, selected_year, year_mode, selected_range):  # pylint: disable=unused-argument
         trigger = ctx.triggered_id
 
         if trigger in {"summary_close", "summary_backdrop"}:
@@ -53,9 +117,15 @@ def register_callbacks(app):
         if trigger == "world_map" and click_data:
             point = (click_data.get("points") or [{}])[0]
             country = point.get("location") or point.get("hovertext")
+            year_span = resolve_year_window(year_mode, selected_range) or resolve_year_pair(year_mode, selected_range)
+            if year_span is not None:
+                selected_year = year_span[1]
             year_value = int(selected_year) if selected_year is not None else None
-            row = extract_summary_row(map_df, country, year_value)
-            content = build_summary_card(country, year_value, row)
+            snapshot = current_snapshot()
+            timeline = country_timeline(snapshot.timeline_index, country)
+            row = extract_summary_row(snapshot.map_df, timeline, year_value)
+            timeline_fig = make_country_timeline(timeline) if timeline is not None else None
+            content = build_summary_card(country, year_value, row, timeline_fig)
             return content, "summary-overlay visible"
 
         raise PreventUpdate
@@ -67,20 +137,35 @@ def register_callbacks(app):
         Input("year_slider", "value"),
         Input("ideology_selector", "value"),
         Input("year_confirmed", "data"),
+        Input("year_mode", "value"),
+        Input("year_range_slider", "value"),
+        Input("data_version", "data"),
     )
-    def update_world_map(selected_regions, selected_democracy, selected_year, selected_ideologies, year_confirmed):
+    def update_world_map(
+        selected_regions,
+        selected_democracy,
+        selected_year,
+        selected_ideologies,
+        year_confirmed,
+        year_mode,
+        selected_range,
+        data_version,
+    ):  # pylint: disable=unused-argument
         regions = resolve_regions(selected_regions)
         has_region_selection = bool(selected_regions)
         ideology_filters = resolve_ideologies(selected_ideologies)
         stage = compute_stage(has_region_selection, selected_democracy, ideology_filters, year_confirmed)
         year_value = int(selected_year) if (stage == 4 and selected_year is not None) else None
         return make_world_map(
+            current_snapshot(),
             stage,
             regions,
             year_value,
             selected_democracy,
             ideology_filters,
             has_region_selection,
+            year_window=resolve_year_window(year_mode, selected_range),
+            year_pair=resolve_year_pair(year_mode, selected_range),
         )
 
     @app.callback(
@@ -88,9 +173,10 @@ def register_callbacks(app):
         Input("region_selector", "value"),
         Input("democracy_selector", "value"),
         Input("ideology_selector", "value"),
+        Input("data_version", "data"),
     )
-    def update_chart(selected_regions, selected_democracy, selected_ideologies):
-        filtered = df
+    def update_chart(selected_regions, selected_democracy, selected_ideologies, data_version):  # pylint: disable=unused-argument
+        filtered = current_snapshot().df
         regions = resolve_regions(selected_regions)
         if regions:
             filtered = filtered[filtered["region"].isin(regions)]
@@ -7,6 +7,7 @@ from .config import (
     INFO_SECTIONS,
     INSTRUCTION_STEPS,
     SECTION_LABEL_STYLE,
+    TIMELINE_CONFIG,
 )
 from .helpers import format_democracy, pref_value, safe_text, political_leaning
 
@@ -121,12 +122,24 @@ def build_overlay(overlay_id, backdrop_id, close_id, content, modal_id=None):
     )
 
 
-def build_summary_card(country, year, row):
+def build_timeline_strip(timeline_fig):
+    if timeline_fig is None:
+        return None
+    return html.Div(
+        [
+            html.H4("Timeline", className="summary-subtitle"),
+            dcc.Graph(figure=timeline_fig, config=TIMELINE_CONFIG, className="summary-timeline"),
+        ]
+    )
+
+
+def build_summary_card(country, year, row, timeline_fig=None):
+    timeline_strip = build_timeline_strip(timeline_fig)
     if row is None:
         message = f"No political summary available for {country or 'the selected country'} in {year or 'this year'}."
         return html.Div(
             className="summary-card",
-            children=[html.Div(message, className="summary-empty")],
+            children=[html.Div(message, className="summary-empty"), timeline_strip],
         )
 
     fields = [
@@ -157,6 +170,7 @@ def build_summary_card(country, year, row):
                     for label, value in fields
                 ]
             ),
+            timeline_strip,
         ],
     )
 
@@ -1,9 +1,16 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_FILE = BASE_DIR / "global_leader_ideologies.csv"
+COUNTRY_BOUNDS_FILE = BASE_DIR / "country_bounds.csv"
 FONT_DIR = (BASE_DIR / "fonts" / "monument-grotesk-font-family-1764226824-0").resolve()
 ASSETS_DIR = (BASE_DIR / "assets").resolve()
+ADMIN_TOKEN = os.environ.get("ATLAS_ADMIN_TOKEN")
+WATCH_DATA_FILE = os.environ.get("ATLAS_WATCH_DATA", "").lower() in {"1", "true", "yes"}
+PROFILE_MEMORY = os.environ.get("ATLAS_PROFILE_MEMORY", "").lower() in {"1", "true", "yes"}
+TRACEMALLOC_FRAMES = 5
+MEMORY_LOG_INTERVAL_SECONDS = 300
 
 SUMMARY_COLUMNS = [
     "hog",
@@ -18,11 +25,28 @@ SUMMARY_COLUMNS = [
 ]
 
 VALID_IDEOLOGIES = ["leftist", "centrist", "rightist"]
+REGIME_FLAGS = ["yes", "no", "no data"]
 COLOR_MAP = {
     "leftist": "#1d76db",
     "centrist": "#b094b0",
     "rightist": "#db231d",
 }
+REGIME_LABELS = {
+    "yes": "Democracy",
+    "no": "Non-democracy",
+    "no data": "No data",
+}
+DIFF_COLOR_MAP = {
+    "Shifted left": COLOR_MAP["leftist"],
+    "Shifted right": COLOR_MAP["rightist"],
+    "Democratized": "#2f9e6a",
+    "Autocratized": "#3a3a3a",
+}
+REGIME_COLOR_MAP = {
+    "yes": "#3a3a3a",
+    "no": "#c9c9c9",
+    "no data": "#f0f0f0",
+}
 GREY_STAGE_COLORS = {
     1: "#dcdcdc",
     2: "#b7b6b6",
@@ -38,6 +62,15 @@ CHOICE_LABEL_STYLE = {
 }
 SECTION_LABEL_STYLE = {"fontSize": 16, "fontWeight": 600}
 HOVER_TEMPLATE = "<b>%{location}</b><br>Click for political summary<extra></extra>"
+WINDOW_HOVER_TEMPLATE = (
+    "<b>%{location}</b><br>"
+    "%{customdata[0]} years in window<br>"
+    "Leftist %{customdata[1]:.0%} · Centrist %{customdata[2]:.0%} · Rightist %{customdata[3]:.0%}"
+    "%{customdata[4]}<extra></extra>"
+)
+DIFF_HOVER_TEMPLATE = (
+    "<b>%{location}</b><br>%{customdata[0]}<br>%{customdata[1]}<br>Click for political summary<extra></extra>"
+)
 HOVER_LABEL_STYLE = {
     "bgcolor": "#ffffff",
     "bordercolor": "#d7d7d7",
@@ -62,5 +95,11 @@ MAP_CONFIG = {
     "responsive": True,
     "scrollZoom": False,
 }
+GEO_PADDING_DEGREES = 3.0
+# selections spanning more longitude than this get the unrotated world view
+GEO_WORLD_SPAN_DEGREES = 300.0
 TREND_CONFIG = {"displayModeBar": False, "staticPlot": True, "responsive": True}
+TIMELINE_CONFIG = {"displayModeBar": False, "responsive": True}
+DATA_WATCH_INTERVAL_SECONDS = 5.0
+DATA_VERSION_POLL_MS = 60_000
 GRAPH_FULL_STYLE = {"width": "100%", "height": "100%"}
@@ -1,6 +1,23 @@
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+
+import numpy as np
 import pandas as pd
 
-from .config import DATA_FILE, SUMMARY_COLUMNS, VALID_IDEOLOGIES
+from .config import DATA_FILE, REGIME_FLAGS, SUMMARY_COLUMNS, VALID_IDEOLOGIES
+from .geo import build_region_bounds, load_country_bounds
+
+REQUIRED_COLUMNS = ["country_name", "year", "hog_ideology", "region", "democracy"]
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetError(ValueError):
+    pass
 
 
 def normalize_democracy(series: pd.Series) -> pd.Series:
@@ -8,26 +25,129 @@ def normalize_democracy(series: pd.Series) -> pd.Series:
     return normalized.where(normalized.isin(["yes", "no"]), "no data")
 
 
-raw_df = pd.read_csv(DATA_FILE)
+def build_trend_frame(raw_df):
+    df = raw_df.reindex(columns=["year", "hog_ideology", "region", "democracy", *SUMMARY_COLUMNS]).copy()
+    df["hog_ideology"] = df["hog_ideology"].str.lower()
+    df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+    df["region"] = df["region"].fillna("Unknown")
+    df["democracy_flag"] = normalize_democracy(df["democracy"])
+    return df
+
+
+def build_map_frame(raw_df):
+    map_df = raw_df.reindex(
+        columns=["country_name", "hog_ideology", "year", "region", "democracy", *SUMMARY_COLUMNS]
+    ).copy()
+    map_df["hog_ideology"] = map_df["hog_ideology"].str.lower()
+    map_df["year"] = pd.to_numeric(map_df["year"], errors="coerce").astype("Int64")
+    map_df = map_df[map_df["hog_ideology"].isin(VALID_IDEOLOGIES)]
+    map_df["democracy_flag"] = normalize_democracy(map_df["democracy"])
+    return map_df.drop_duplicates(subset=["country_name", "year"], keep="last")
+
+
+@dataclass(frozen=True)
+class YearWindowIndex:
+    countries: np.ndarray
+    regions: np.ndarray
+    years: np.ndarray
+    # cumulative[c, k, r, i]: rows for country c, regime r, ideology i within the first k years
+    cumulative: np.ndarray
+    # last_seen[c, k, r, i]: latest year slot <= k holding such a row (0 if none); breaks window ties
+    last_seen: np.ndarray
+
 
-df = raw_df.reindex(columns=["year", "hog_ideology", "region", "democracy", *SUMMARY_COLUMNS]).copy()
-df["hog_ideology"] = df["hog_ideology"].str.lower()
-df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
-df["region"] = df["region"].fillna("Unknown")
-df["democracy_flag"] = normalize_democracy(df["democracy"])
+def build_window_index(frame):
+    rows = frame.dropna(subset=["country_name", "year"])
+    countries = pd.Index(sorted(rows["country_name"].unique()))
+    years = pd.Index(sorted(int(year) for year in rows["year"].unique()))
 
-map_df = raw_df.reindex(
-    columns=["country_name", "hog_ideology", "year", "region", "democracy", *SUMMARY_COLUMNS]
-).copy()
-map_df["hog_ideology"] = map_df["hog_ideology"].str.lower()
-map_df["year"] = pd.to_numeric(map_df["year"], errors="coerce").astype("Int64")
-map_df = map_df[map_df["hog_ideology"].isin(VALID_IDEOLOGIES)]
-map_df["democracy_flag"] = normalize_democracy(map_df["democracy"])
-map_df = map_df.drop_duplicates(subset=["country_name", "year"], keep="last")
+    counts = np.zeros(
+        (len(countries), len(years) + 1, len(REGIME_FLAGS), len(VALID_IDEOLOGIES)),
+        dtype=np.int32,
+    )
+    np.add.at(
+        counts,
+        (
+            countries.get_indexer(rows["country_name"]),
+            years.get_indexer(rows["year"].astype(int)) + 1,
+            pd.Index(REGIME_FLAGS).get_indexer(rows["democracy_flag"]),
+            pd.Index(VALID_IDEOLOGIES).get_indexer(rows["hog_ideology"]),
+        ),
+        1,
+    )
+    regions = rows.groupby("country_name")["region"].last().reindex(countries).fillna("Unknown")
+    return YearWindowIndex(
+        countries=countries.to_numpy(),
+        regions=regions.to_numpy(),
+        years=years.to_numpy(),
+        cumulative=counts.cumsum(axis=1),
+        last_seen=np.maximum.accumulate(
+            np.where(counts > 0, np.arange(len(years) + 1)[None, :, None, None], 0).astype(np.int16),
+            axis=1,
+        ),
+    )
 
-available_years = sorted(map_df["year"].dropna().unique())
-min_year = int(available_years[0]) if available_years else None
-max_year = int(available_years[-1]) if available_years else None
+
+@dataclass(frozen=True)
+class CountryTimelineIndex:
+    # lowercase country name -> (start, stop) into the contiguous arrays below
+    offsets: dict
+    years: np.ndarray
+    ideology_codes: np.ndarray
+    democracy_codes: np.ndarray
+    row_positions: np.ndarray
+
+
+def build_timeline_index(frame):
+    keys = pd.DataFrame(
+        {
+            "name": frame["country_name"].fillna("").str.strip().str.lower().to_numpy(),
+            "year": frame["year"].to_numpy(dtype="float64", na_value=np.nan),
+            "position": np.arange(len(frame)),
+        }
+    )
+    keys = keys[keys["name"].ne("") & keys["year"].notna()].sort_values(["name", "year"], kind="stable")
+    positions = keys["position"].to_numpy()
+
+    names = keys["name"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(names)]
+    return CountryTimelineIndex(
+        offsets={names[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)},
+        years=keys["year"].to_numpy(dtype=np.int32),
+        ideology_codes=pd.Index(VALID_IDEOLOGIES).get_indexer(frame["hog_ideology"].iloc[positions]).astype(np.int8),
+        democracy_codes=pd.Index(REGIME_FLAGS).get_indexer(frame["democracy_flag"].iloc[positions]).astype(np.int8),
+        row_positions=positions,
+    )
+
+
+@dataclass(frozen=True)
+class YearCodeMatrix:
+    countries: np.ndarray
+    regions: np.ndarray
+    years: np.ndarray
+    # [country, year] codes into VALID_IDEOLOGIES / REGIME_FLAGS; -1 where the country has no row
+    ideology_codes: np.ndarray
+    democracy_codes: np.ndarray
+
+
+def build_year_code_matrix(frame, window_index):
+    rows = frame.dropna(subset=["country_name", "year"])
+    country_idx = pd.Index(window_index.countries).get_indexer(rows["country_name"])
+    year_idx = pd.Index(window_index.years).get_indexer(rows["year"].astype(int))
+    shape = (len(window_index.countries), len(window_index.years))
+
+    ideology_codes = np.full(shape, -1, dtype=np.int8)
+    ideology_codes[country_idx, year_idx] = pd.Index(VALID_IDEOLOGIES).get_indexer(rows["hog_ideology"])
+    democracy_codes = np.full(shape, -1, dtype=np.int8)
+    democracy_codes[country_idx, year_idx] = pd.Index(REGIME_FLAGS).get_indexer(rows["democracy_flag"])
+    return YearCodeMatrix(
+        countries=window_index.countries,
+        regions=window_index.regions,
+        years=window_index.years,
+        ideology_codes=ideology_codes,
+        democracy_codes=democracy_codes,
+    )
 
 
 def build_year_marks(years):
@@ -41,4 +161,133 @@ def build_year_marks(years):
     }
 
 
-year_marks = build_year_marks(available_years)
+@dataclass(frozen=True, eq=False)
+class DatasetSnapshot:
+    version: str
+    loaded_at: float
+    df: pd.DataFrame
+    map_df: pd.DataFrame
+    available_years: list
+    min_year: int
+    max_year: int
+    year_marks: dict
+    regions: list
+    window_index: YearWindowIndex
+    timeline_index: CountryTimelineIndex
+    code_matrix: YearCodeMatrix
+    # region -> (west, south, east, north); east may exceed 180 across the antimeridian
+    region_bounds: dict
+    # derived artefacts (default figures etc.); dropped together with the snapshot
+    cache: dict = field(default_factory=dict, repr=False)
+
+    def cached(self, key, build):
+        if key not in self.cache:
+            self.cache[key] = build()
+        return self.cache[key]
+
+
+def load_snapshot(path=DATA_FILE):
+    payload = path.read_bytes()
+    try:
+        raw_df = pd.read_csv(BytesIO(payload))
+    except (ValueError, pd.errors.ParserError) as exc:
+        raise DatasetError(f"{path} is not a readable CSV: {exc}") from exc
+    missing = [column for column in REQUIRED_COLUMNS if column not in raw_df.columns]
+    if missing:
+        raise DatasetError(f"{path} is missing columns: {', '.join(missing)}")
+    map_df = build_map_frame(raw_df)
+    available_years = sorted(int(year) for year in map_df["year"].dropna().unique())
+    window_index = build_window_index(map_df)
+    return DatasetSnapshot(
+        version=hashlib.sha1(payload).hexdigest()[:12],
+        loaded_at=time.time(),
+        df=build_trend_frame(raw_df),
+        map_df=map_df,
+        available_years=available_years,
+        min_year=available_years[0] if available_years else None,
+        max_year=available_years[-1] if available_years else None,
+        year_marks=build_year_marks(available_years),
+        regions=sorted(map_df["region"].dropna().unique()),
+        window_index=window_index,
+        timeline_index=build_timeline_index(map_df),
+        code_matrix=build_year_code_matrix(map_df, window_index),
+        region_bounds=build_region_bounds(map_df, country_bounds),
+    )
+
+
+country_bounds = load_country_bounds()
+_snapshot = load_snapshot()
+_reload_lock = threading.Lock()
+# "running": a background reload thread exists; "pending": another reload was requested meanwhile
+_reload_status = {"last_error": None, "running": False, "pending": False}
+_reload_state_lock = threading.Lock()
+
+
+def current_snapshot():
+    return _snapshot
+
+
+def last_reload_error():
+    return _reload_status["last_error"]
+
+
+def reload_snapshot(path=DATA_FILE):
+    global _snapshot  # pylint: disable=global-statement
+    with _reload_lock:
+        snapshot = load_snapshot(path)
+        if snapshot.version != _snapshot.version:
+            _snapshot = snapshot
+        _reload_status["last_error"] = None
+        return _snapshot
+
+
+def reload_snapshot_logged(path=DATA_FILE):
+    # background reloads must never take their thread down silently; keep serving the last good snapshot
+    try:
+        return reload_snapshot(path)
+    except Exception as exc:  # pylint: disable=broad-except
+        _reload_status["last_error"] = f"{type(exc).__name__}: {exc}"
+        logger.exception("Dataset reload from %s failed; still serving version %s", path, _snapshot.version)
+        return None
+
+
+def _run_pending_reloads(path):
+    while True:
+        reload_snapshot_logged(path)
+        with _reload_state_lock:
+            if not _reload_status["pending"]:
+                _reload_status["running"] = False
+                return
+            _reload_status["pending"] = False
+
+
+def reload_snapshot_async(path=DATA_FILE):
+    # overlapping requests collapse into at most one follow-up reload instead of a thread each
+    with _reload_state_lock:
+        if _reload_status["running"]:
+            _reload_status["pending"] = True
+            return False
+        _reload_status["running"] = True
+    thread = threading.Thread(target=_run_pending_reloads, args=(path,), name="dataset-reload", daemon=True)
+    thread.start()
+    return True
+
+
+def start_data_watcher(path=DATA_FILE, interval=5.0):
+    def watch():
+        last_mtime = None
+        while True:
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                logger.warning("Cannot stat %s; retrying in %ss", path, interval)
+            else:
+                if last_mtime is not None and mtime != last_mtime:
+                    # a failed (e.g. mid-write) reload is retried once the file changes again
+                    reload_snapshot_logged(path)
+                last_mtime = mtime
+            time.sleep(interval)
+
+    thread = threading.Thread(target=watch, name="dataset-watcher", daemon=True)
+    thread.start()
+    return thread
@@ -1,37 +1,81 @@
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
 from .config import (
     COLOR_MAP,
+    DIFF_COLOR_MAP,
+    DIFF_HOVER_TEMPLATE,
     FONT_FAMILY,
     GREY_STAGE_COLORS,
     HOVER_LABEL_STYLE,
     HOVER_TEMPLATE,
+    REGIME_COLOR_MAP,
+    REGIME_FLAGS,
+    REGIME_LABELS,
     VALID_IDEOLOGIES,
+    WINDOW_HOVER_TEMPLATE,
+)
+from .geo import region_viewport
+from .helpers import (
+    aggregate_year_window,
+    apply_multi_filter,
+    diff_years,
+    prepare_stage_highlight,
+    resolve_ideologies,
 )
-from .data import df, map_df
-from .helpers import apply_multi_filter, prepare_stage_highlight, resolve_ideologies
 
 
 def make_world_map(
+    snapshot,
     stage,
     selected_regions=None,
     selected_year=None,
     democracy_filters=None,
     ideology_filters=None,
     has_region_selection=False,
+    year_window=None,
+    year_pair=None,
 ):
-    filtered = map_df
+    hover_template = HOVER_TEMPLATE
+    window_mode = stage == 4 and year_window is not None
+    diff_mode = stage == 4 and year_pair is not None
+    if diff_mode:
+        filtered = diff_years(snapshot.code_matrix, *year_pair, democracy_filters, ideology_filters)
+    elif window_mode:
+        filtered = aggregate_year_window(snapshot.window_index, *year_window, democracy_filters, ideology_filters)
+    else:
+        filtered = snapshot.map_df
     if selected_regions:
         filtered = filtered[filtered["region"].isin(selected_regions)]
 
-    if stage == 4:
+    if stage == 4 and not (window_mode or diff_mode):
         filtered = apply_multi_filter(filtered, "democracy_flag", democracy_filters)
         filtered = apply_multi_filter(filtered, "hog_ideology", ideology_filters)
         if selected_year is not None:
             filtered = filtered[filtered["year"] == selected_year]
 
-    if stage == 4 and selected_year is not None and not filtered.empty:
+    if diff_mode and not filtered.empty:
+        fig = px.choropleth(
+            filtered,
+            locations="country_name",
+            locationmode="country names",
+            color="change",
+            color_discrete_map=DIFF_COLOR_MAP,
+            custom_data=["ideology_change", "regime_change"],
+        )
+        hover_template = DIFF_HOVER_TEMPLATE
+    elif window_mode and not filtered.empty:
+        fig = px.choropleth(
+            filtered,
+            locations="country_name",
+            locationmode="country names",
+            color="hog_ideology",
+            color_discrete_map=COLOR_MAP,
+            custom_data=["years_counted", *(f"{ide}_share" for ide in VALID_IDEOLOGIES), "tie_note"],
+        )
+        hover_template = WINDOW_HOVER_TEMPLATE
+    elif stage == 4 and selected_year is not None and not filtered.empty:
         fig = px.choropleth(
             filtered,
             locations="country_name",
@@ -42,7 +86,7 @@ def make_world_map(
     else:
         highlight_df = prepare_stage_highlight(
             stage,
-            map_df,
+            snapshot.map_df,
             selected_regions,
             democracy_filters,
             ideology_filters,
@@ -72,7 +116,7 @@ def make_world_map(
         showframe=False,
     )
     if selected_regions:
-        fig.update_geos(fitbounds="locations")
+        fig.update_geos(**region_viewport(snapshot, selected_regions))
     else:
         fig.update_geos(fitbounds=None)
     fig.update_layout(
@@ -81,7 +125,7 @@ def make_world_map(
         font=dict(family=FONT_FAMILY),
     )
     if fig.data:
-        fig.update_traces(hovertemplate=HOVER_TEMPLATE, hoverlabel=HOVER_LABEL_STYLE)
+        fig.update_traces(hovertemplate=hover_template, hoverlabel=HOVER_LABEL_STYLE)
     return fig
 
 
@@ -129,9 +173,61 @@ def make_trend_chart(filtered_df, selected_ideologies):
     return fig
 
 
-def default_world_map_fig():
-    return make_world_map(stage=0)
+def make_country_timeline(timeline):
+    colors = [COLOR_MAP[ide] for ide in VALID_IDEOLOGIES] + [REGIME_COLOR_MAP[flag] for flag in REGIME_FLAGS]
+    labels = np.array(
+        [ide.capitalize() for ide in VALID_IDEOLOGIES] + [REGIME_LABELS[flag] for flag in REGIME_FLAGS] + ["Not coded"]
+    )
+    regime_offset = len(VALID_IDEOLOGIES)
+
+    # lay the strip out on every year so uncoded years stay empty instead of
+    # being painted by the heatmap's neighbouring cells
+    coded_years = timeline["years"]
+    years = np.arange(coded_years[0], coded_years[-1] + 1) if len(coded_years) else coded_years
+    slots = coded_years - (years[0] if len(years) else 0)
+    ideology_codes = np.full(len(years), np.nan)
+    ideology_codes[slots] = timeline["ideology_codes"]
+    democracy_codes = np.full(len(years), np.nan)
+    democracy_codes[slots] = timeline["democracy_codes"] + regime_offset
+    label_positions = np.vstack([ideology_codes, democracy_codes])
+    label_positions = np.where(np.isnan(label_positions), len(labels) - 1, label_positions).astype(int)
+
+    colorscale = []
+    for code, color in enumerate(colors):
+        colorscale += [(code / len(colors), color), ((code + 1) / len(colors), color)]
+
+    fig = go.Figure(
+        go.Heatmap(
+            x=years,
+            y=["Ideology", "Regime"],
+            z=[ideology_codes, democracy_codes],
+            text=labels[label_positions],
+            zmin=-0.5,
+            zmax=len(colors) - 0.5,
+            colorscale=colorscale,
+            showscale=False,
+            xgap=0,
+            ygap=2,
+            hovertemplate="%{x}: %{text}<extra></extra>",
+            hoverlabel=HOVER_LABEL_STYLE,
+        )
+    )
+    fig.update_layout(
+        template="plotly_white",
+        height=90,
+        margin=dict(l=60, r=0, t=0, b=20),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family=FONT_FAMILY, size=11),
+    )
+    fig.update_xaxes(fixedrange=True, showgrid=False, nticks=6)
+    fig.update_yaxes(fixedrange=True, showgrid=False, autorange="reversed")
+    return fig
+
+
+def default_world_map_fig(snapshot):
+    return snapshot.cached("default_world_map", lambda: make_world_map(snapshot, stage=0))
 
 
-def default_trend_fig():
-    return make_trend_chart(df, VALID_IDEOLOGIES)
+def default_trend_fig(snapshot):
+    return snapshot.cached("default_trend", lambda: make_trend_chart(snapshot.df, VALID_IDEOLOGIES))
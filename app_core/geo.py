@@ -0,0 +1,85 @@
+import pandas as pd
+
+from .config import COUNTRY_BOUNDS_FILE, GEO_PADDING_DEGREES, GEO_WORLD_SPAN_DEGREES
+
+
+def load_country_bounds(path=COUNTRY_BOUNDS_FILE):
+    return pd.read_csv(path).set_index("country_name")
+
+
+def wrap_lon(lon):
+    return (lon + 180) % 360 - 180
+
+
+def union_lon_arcs(arcs):
+    # Arcs run eastward from west to east (east may exceed 180); the union is the
+    # circle minus its largest uncovered gap.
+    normalized = sorted((wrap_lon(west), wrap_lon(west) + (east - west)) for west, east in arcs)
+    merged = []
+    for west, east in normalized:
+        if merged and west <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], east)
+        else:
+            merged.append([west, east])
+
+    gaps = [(merged[pos][1], merged[pos + 1][0]) for pos in range(len(merged) - 1)]
+    gaps.append((merged[-1][1], merged[0][0] + 360))
+    gap_start, gap_end = max(gaps, key=lambda gap: gap[1] - gap[0])
+    if gap_end - gap_start <= 0:
+        return -180.0, 180.0
+    west = wrap_lon(gap_end)
+    east = west + (360 - (gap_end - gap_start))
+    return west, east
+
+
+def union_bounds(bounds):
+    bounds = list(bounds)
+    west, east = union_lon_arcs([(box[0], box[2]) for box in bounds])
+    south = min(box[1] for box in bounds)
+    north = max(box[3] for box in bounds)
+    return west, south, east, north
+
+
+def build_region_bounds(map_frame, country_bounds):
+    countries = map_frame[["country_name", "region"]].dropna().drop_duplicates("country_name")
+    countries = countries[countries["country_name"].isin(country_bounds.index)]
+    boxes = country_bounds.loc[countries["country_name"], ["lon_min", "lat_min", "lon_max", "lat_max"]]
+    boxes = boxes.assign(region=countries["region"].to_numpy())
+    return {
+        region: union_bounds(group[["lon_min", "lat_min", "lon_max", "lat_max"]].itertuples(index=False))
+        for region, group in boxes.groupby("region")
+    }
+
+
+def geo_viewport(bounds, padding=GEO_PADDING_DEGREES, world_span=GEO_WORLD_SPAN_DEGREES):
+    west, south, east, north = bounds
+    west, east = west - padding, east + padding
+    if east - west > world_span:
+        # a near-global selection keeps the same 0°-centred frame as no selection at all
+        west, south, east, north = -180.0, -90.0, 180.0, 90.0
+    south, north = max(south - padding, -90.0), min(north + padding, 90.0)
+    # shift the range so it is centred on the (wrapped) projection rotation
+    center_lon = wrap_lon((west + east) / 2)
+    shift = center_lon - (west + east) / 2
+    west, east = west + shift, east + shift
+    west, south, east, north, center_lon = (round(value, 2) for value in (west, south, east, north, center_lon))
+    return {
+        "fitbounds": False,
+        "projection_type": "equirectangular",
+        "projection_rotation_lon": center_lon,
+        "center": {"lon": center_lon, "lat": round((south + north) / 2, 2)},
+        "lonaxis_range": [west, east],
+        "lataxis_range": [south, north],
+    }
+
+
+def region_viewport(snapshot, regions):
+    key = ("region_viewport", frozenset(regions))
+
+    def build():
+        bounds = [snapshot.region_bounds[region] for region in regions if region in snapshot.region_bounds]
+        if not bounds:
+            return {"fitbounds": "locations"}
+        return geo_viewport(union_bounds(bounds))
+
+    return snapshot.cached(key, build)
@@ -1,8 +1,9 @@
 from numbers import Number
 
+import numpy as np
 import pandas as pd
 
-from .config import VALID_IDEOLOGIES
+from .config import REGIME_FLAGS, REGIME_LABELS, VALID_IDEOLOGIES
 
 
 def resolve_regions(selection):
@@ -82,17 +83,148 @@ def pref_value(row, primary, fallback):
     return safe_text(value)
 
 
-def extract_summary_row(map_frame, country, year):
-    if not country or year is None:
+def country_timeline(index, country):
+    if not country:
         return None
-    country_lower = str(country).strip().lower()
-    matches = map_frame[
-        map_frame["country_name"].fillna("").str.lower().eq(country_lower)
-        & map_frame["year"].eq(year)
-    ]
-    if matches.empty:
+    bounds = index.offsets.get(str(country).strip().lower())
+    if bounds is None:
         return None
-    return matches.iloc[0]
+    window = slice(*bounds)
+    return {
+        "years": index.years[window],
+        "ideology_codes": index.ideology_codes[window],
+        "democracy_codes": index.democracy_codes[window],
+        "row_positions": index.row_positions[window],
+    }
+
+
+def extract_summary_row(map_frame, timeline, year):
+    if timeline is None or year is None:
+        return None
+    years = timeline["years"]
+    pos = np.searchsorted(years, year)
+    if pos >= len(years) or years[pos] != year:
+        return None
+    return map_frame.iloc[timeline["row_positions"][pos]]
+
+
+def clamp_year(value, lowest, highest, fallback):
+    if value is None:
+        return fallback
+    return min(max(int(value), lowest), highest)
+
+
+def resolve_year_span(year_mode, expected_mode, year_range):
+    if year_mode != expected_mode or not year_range or len(year_range) != 2:
+        return None
+    start, end = sorted(int(year) for year in year_range)
+    return start, end
+
+
+def resolve_year_window(year_mode, year_range):
+    return resolve_year_span(year_mode, "range", year_range)
+
+
+def resolve_year_pair(year_mode, year_range):
+    return resolve_year_span(year_mode, "compare", year_range)
+
+
+def aggregate_year_window(index, start, end, regimes=None, ideologies=None):
+    lo = np.searchsorted(index.years, start, side="left")
+    hi = np.searchsorted(index.years, end, side="right")
+    window = index.cumulative[:, hi] - index.cumulative[:, lo]
+
+    regime_positions = [pos for pos, flag in enumerate(REGIME_FLAGS) if regimes is None or flag in regimes]
+    counts = window[:, regime_positions].sum(axis=1)
+    ideology_mask = np.array([ideologies is None or ide in ideologies for ide in VALID_IDEOLOGIES])
+    counts = counts * ideology_mask
+
+    totals = counts.sum(axis=1)
+    present = totals > 0
+    counts, totals = counts[present], totals[present]
+    shares = counts / totals[:, None]
+
+    # Ties on year counts go to the tied ideology held most recently within the window.
+    # Every country has one row per year, so tied ideologies never share a last year.
+    latest = index.last_seen[present, hi][:, regime_positions].max(axis=1, initial=0)
+    tied = counts == counts.max(axis=1, keepdims=True)
+    dominant = np.where(tied, latest, -1).argmax(axis=1)
+
+    aggregated = pd.DataFrame(
+        {
+            "country_name": index.countries[present],
+            "region": index.regions[present],
+            "hog_ideology": np.asarray(VALID_IDEOLOGIES)[dominant],
+            "years_counted": totals,
+            "tie_note": np.where(tied.sum(axis=1) > 1, "<br>Tied: coloured by the most recent of the tied ideologies", ""),
+        }
+    )
+    for pos, ideology in enumerate(VALID_IDEOLOGIES):
+        aggregated[f"{ideology}_share"] = shares[:, pos]
+    return aggregated
+
+
+def _year_column(matrix, year):
+    pos = np.searchsorted(matrix.years, year)
+    if pos >= len(matrix.years) or matrix.years[pos] != year:
+        return None
+    return pos
+
+
+def diff_years(matrix, from_year, to_year, regimes=None, ideologies=None):
+    columns = [_year_column(matrix, year) for year in (from_year, to_year)]
+    if None in columns:
+        return pd.DataFrame(columns=["country_name", "region", "change", "ideology_change", "regime_change"])
+    before, after = columns
+
+    ideology_from, ideology_to = matrix.ideology_codes[:, before], matrix.ideology_codes[:, after]
+    regime_from, regime_to = matrix.democracy_codes[:, before], matrix.democracy_codes[:, after]
+    missing_regime = REGIME_FLAGS.index("no data")
+
+    ideology_known = (ideology_from >= 0) & (ideology_to >= 0)
+    regime_known = (regime_from >= 0) & (regime_to >= 0) & (regime_from != missing_regime) & (regime_to != missing_regime)
+    ideology_changed = ideology_known & (ideology_from != ideology_to)
+    regime_changed = regime_known & (regime_from != regime_to)
+
+    keep = ideology_changed | regime_changed
+    if regimes is not None:
+        regime_positions = [pos for pos, flag in enumerate(REGIME_FLAGS) if flag in regimes]
+        keep &= np.isin(regime_from, regime_positions) | np.isin(regime_to, regime_positions)
+    if ideologies is not None:
+        ideology_positions = [pos for pos, ide in enumerate(VALID_IDEOLOGIES) if ide in ideologies]
+        keep &= np.isin(ideology_from, ideology_positions) | np.isin(ideology_to, ideology_positions)
+
+    # VALID_IDEOLOGIES order runs left to right, so the sign of the code delta is the direction
+    change = np.where(ideology_to > ideology_from, "Shifted right", "Shifted left")
+    regime_direction = np.where(regime_to == REGIME_FLAGS.index("yes"), "Democratized", "Autocratized")
+    change = np.where(ideology_changed, change, regime_direction)
+
+    # trailing sentinel so that the -1 "no row" code indexes to it
+    ideology_names = np.array([ide.capitalize() for ide in VALID_IDEOLOGIES] + ["No data"])
+    regime_names = np.array([REGIME_LABELS[flag] for flag in REGIME_FLAGS] + ["No data"])
+    # labels report any difference, including to or from "No data"; only colour and direction need both sides known
+    ideology_from_names, ideology_to_names = ideology_names[ideology_from], ideology_names[ideology_to]
+    regime_from_names, regime_to_names = regime_names[regime_from], regime_names[regime_to]
+    ideology_change = np.where(
+        ideology_from_names != ideology_to_names,
+        np.char.add(np.char.add(ideology_from_names, " → "), ideology_to_names),
+        np.char.add(ideology_to_names, " (unchanged)"),
+    )
+    regime_change = np.where(
+        regime_from_names != regime_to_names,
+        np.char.add(np.char.add(regime_from_names, " → "), regime_to_names),
+        np.char.add(regime_to_names, " (unchanged)"),
+    )
+
+    return pd.DataFrame(
+        {
+            "country_name": matrix.countries[keep],
+            "region": matrix.regions[keep],
+            "change": change[keep],
+            "ideology_change": ideology_change[keep],
+            "regime_change": regime_change[keep],
+        }
+    )
 
 
 def compute_stage(has_region, regimes, ideologies, year_selected):
@@ -6,13 +6,29 @@ from .components import (
     build_overlay,
     build_sidebar,
 )
-from .config import FONT_FAMILY, GRAPH_FULL_STYLE, MAP_CONFIG, TREND_CONFIG, VALID_IDEOLOGIES
-from .data import map_df, max_year, min_year, year_marks
+from .config import (
+    CHOICE_LABEL_STYLE,
+    DATA_VERSION_POLL_MS,
+    FONT_FAMILY,
+    GRAPH_FULL_STYLE,
+    MAP_CONFIG,
+    TREND_CONFIG,
+    VALID_IDEOLOGIES,
+)
+from .figures import default_trend_fig, default_world_map_fig
+
+
+def slider_bounds(snapshot):
+    slider_min = snapshot.min_year if snapshot.min_year is not None else 0
+    slider_max = snapshot.max_year if snapshot.max_year is not None else 0
+    return slider_min, slider_max, snapshot.year_marks or {}
 
 
-def build_layout(default_world_map, default_trend_chart):
-    regions = sorted(map_df["region"].dropna().unique())
+def build_layout(snapshot):
+    default_world_map = default_world_map_fig(snapshot)
+    default_trend_chart = default_trend_fig(snapshot)
     ideology_options = build_ideology_options(VALID_IDEOLOGIES)
+    slider_min, slider_max, year_marks = slider_bounds(snapshot)
 
     return html.Div(
         style={
@@ -26,6 +42,8 @@ def build_layout(default_world_map, default_trend_chart):
         },
         children=[
             dcc.Store(id="year_confirmed", data=False),
+            dcc.Store(id="data_version", data=snapshot.version),
+            dcc.Interval(id="data_version_poll", interval=DATA_VERSION_POLL_MS),
             build_overlay(
                 overlay_id="summary_overlay",
                 backdrop_id="summary_backdrop",
@@ -40,7 +58,7 @@ def build_layout(default_world_map, default_trend_chart):
                 content=build_info_card(),
                 modal_id="info_modal",
             ),
-            build_sidebar(regions, ideology_options),
+            build_sidebar(snapshot.regions, ideology_options),
             html.Div(
                 id="main_panel",
                 style={
@@ -89,17 +107,51 @@ def build_layout(default_world_map, default_trend_chart):
                                 style={"flex": "1 1 auto", **GRAPH_FULL_STYLE},
                             ),
                             html.Div(
-                                style={"paddingTop": "6px"},
+                                style={"paddingTop": "6px", "display": "flex", "alignItems": "flex-start"},
                                 children=[
-                                    dcc.Slider(
-                                        id="year_slider",
-                                        min=min_year if min_year is not None else 0,
-                                        max=max_year if max_year is not None else 0,
-                                        value=max_year if max_year is not None else 0,
-                                        included=False,
-                                        marks=year_marks if year_marks else {},
-                                        step=1,
-                                        tooltip={"always_visible": False, "placement": "bottom"},
+                                    html.Div(
+                                        id="year_slider_container",
+                                        style={"flex": "1 1 auto"},
+                                        children=[
+                                            dcc.Slider(
+                                                id="year_slider",
+                                                min=slider_min,
+                                                max=slider_max,
+                                                value=slider_max,
+                                                included=False,
+                                                marks=year_marks,
+                                                step=1,
+                                                tooltip={"always_visible": False, "placement": "bottom"},
+                                            ),
+                                        ],
+                                    ),
+                                    html.Div(
+                                        id="year_range_container",
+                                        style={"flex": "1 1 auto", "display": "none"},
+                                        children=[
+                                            dcc.RangeSlider(
+                                                id="year_range_slider",
+                                                min=slider_min,
+                                                max=slider_max,
+                                                value=[slider_min, slider_max],
+                                                marks=year_marks,
+                                                step=1,
+                                                allowCross=False,
+                                                tooltip={"always_visible": False, "placement": "bottom"},
+                                            ),
+                                        ],
+                                    ),
+                                    dcc.RadioItems(
+                                        id="year_mode",
+                                        options=[
+                                            {"label": "Year", "value": "single"},
+                                            {"label": "Range", "value": "range"},
+                                            {"label": "Compare", "value": "compare"},
+                                        ],
+                                        value="single",
+                                        labelStyle=CHOICE_LABEL_STYLE,
+                                        inputStyle={"marginRight": "4px"},
+                                        style={"flex": "0 0 auto", "paddingLeft": "12px", "fontSize": 13},
                                     ),
                                 ],
                             ),
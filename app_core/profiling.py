@@ -0,0 +1,245 @@
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from flask import g, request
+
+from .config import MEMORY_LOG_INTERVAL_SECONDS, TRACEMALLOC_FRAMES
+
+CALLBACK_PATH = "/_dash-update-component"
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_callback_stats = defaultdict(
+    lambda: {
+        "calls": 0,
+        "net_retained_bytes": 0,
+        "max_net_retained_bytes": 0,
+        "isolated_calls": 0,
+        "peak_allocated_bytes": 0,
+        "max_peak_allocated_bytes": 0,
+    }
+)
+# tracemalloc.reset_peak() is Python 3.9+; without it peaks are not attributed to callbacks
+_CAN_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+# request token -> overlapped flag for callback requests currently being served
+_in_flight = {}
+_state = {"baseline": None, "baseline_taken_at": None, "peak_before_reset": 0, "logger_thread": None}
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def is_enabled():
+    return tracemalloc.is_tracing()
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            resident_pages = int(handle.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes():
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux and the BSDs
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+
+def reset_baseline():
+    with _lock:
+        _state["baseline"] = take_snapshot() if is_enabled() else None
+        _state["baseline_taken_at"] = time.time() if is_enabled() else None
+
+
+def format_stat(stat):
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+        "size_diff_bytes": getattr(stat, "size_diff", None),
+        "count_diff": getattr(stat, "count_diff", None),
+    }
+
+
+def top_allocations(limit=20, group_by="lineno"):
+    snapshot = take_snapshot()
+    top = [format_stat(stat) for stat in snapshot.statistics(group_by)[:limit]]
+    with _lock:
+        baseline = _state["baseline"]
+    diff = []
+    if baseline is not None:
+        diff = [format_stat(stat) for stat in snapshot.compare_to(baseline, group_by)[:limit]]
+    return top, diff
+
+
+def callback_stats():
+    with _lock:
+        return {
+            label: {
+                **stats,
+                "mean_net_retained_bytes": stats["net_retained_bytes"] / stats["calls"] if stats["calls"] else 0,
+                "mean_peak_allocated_bytes": (
+                    stats["peak_allocated_bytes"] / stats["isolated_calls"] if stats["isolated_calls"] else None
+                ),
+            }
+            for label, stats in _callback_stats.items()
+        }
+
+
+def traced_memory():
+    # peak is tracked across the per-callback reset_peak() calls below
+    current, peak = tracemalloc.get_traced_memory()
+    with _lock:
+        return current, max(peak, _state["peak_before_reset"])
+
+
+def gc_summary():
+    return {
+        "counts": gc.get_count(),
+        "collections": [generation["collections"] for generation in gc.get_stats()],
+        "uncollectable": [generation["uncollectable"] for generation in gc.get_stats()],
+    }
+
+
+def memory_report(limit=20, group_by="lineno"):
+    report = {
+        "enabled": is_enabled(),
+        "rss_bytes": current_rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "gc": gc_summary(),
+    }
+    if not is_enabled():
+        return report
+    current, peak = traced_memory()
+    top, diff = top_allocations(limit, group_by)
+    with _lock:
+        baseline_taken_at = _state["baseline_taken_at"]
+    report.update(
+        {
+            "traced": {"current_bytes": current, "peak_bytes": peak},
+            "baseline_taken_at": baseline_taken_at,
+            "callbacks": callback_stats(),
+            "top": top,
+            "diff_since_baseline": diff,
+        }
+    )
+    return report
+
+
+def track_callback_allocations(server):
+    # net_retained_bytes: change in traced memory across the request. Memory a
+    # callback allocates and frees again is invisible here, and under a threaded
+    # server other requests' allocations leak in, so treat it as a leak signal.
+    # peak_allocated_bytes: traced peak above the starting level, which does
+    # capture transient allocations. The peak counter is process-wide, so it is
+    # only recorded for requests that ran with no other callback in flight.
+    @server.before_request
+    def start_allocation_counter():
+        if not (request.path.endswith(CALLBACK_PATH) and is_enabled()):
+            return
+        payload = request.get_json(silent=True) or {}
+        token = object()
+        with _lock:
+            if _in_flight:
+                for other in _in_flight:
+                    _in_flight[other] = True
+            elif _CAN_RESET_PEAK:
+                _state["peak_before_reset"] = max(_state["peak_before_reset"], tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+            _in_flight[token] = bool(_in_flight) or not _CAN_RESET_PEAK
+            g.memory_before = tracemalloc.get_traced_memory()[0]
+        g.memory_callback = payload.get("output", "unknown")
+        g.memory_token = token
+
+    # teardown rather than after_request: it also runs when the callback raises,
+    # so a failed request cannot stay "in flight" and mark every later one overlapped
+    @server.teardown_request
+    def stop_allocation_counter(exc):  # pylint: disable=unused-argument
+        label = g.pop("memory_callback", None)
+        before = g.pop("memory_before", None)
+        token = g.pop("memory_token", None)
+        if label is None or before is None or not is_enabled():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        with _lock:
+            overlapped = _in_flight.pop(token, True)
+            stats = _callback_stats[label]
+            stats["calls"] += 1
+            stats["net_retained_bytes"] += current - before
+            stats["max_net_retained_bytes"] = max(stats["max_net_retained_bytes"], current - before)
+            if not overlapped:
+                stats["isolated_calls"] += 1
+                stats["peak_allocated_bytes"] += peak - before
+                stats["max_peak_allocated_bytes"] = max(stats["max_peak_allocated_bytes"], peak - before)
+
+
+def log_memory_summary():
+    rss = current_rss_bytes()
+    peak_rss = peak_rss_bytes()
+    current, peak = traced_memory() if is_enabled() else (0, 0)
+    stats = callback_stats()
+    heaviest = max(
+        stats.items(), key=lambda item: item[1]["max_peak_allocated_bytes"], default=(None, None)
+    )[0]
+    logger.info(
+        "memory: rss=%s peak_rss=%s traced=%.1fMiB peak=%.1fMiB gc_counts=%s gc_collections=%s heaviest_peak_callback=%s",
+        "n/a" if rss is None else f"{rss / 2**20:.1f}MiB",
+        "n/a" if peak_rss is None else f"{peak_rss / 2**20:.1f}MiB",
+        current / 2**20,
+        peak / 2**20,
+        gc.get_count(),
+        gc_summary()["collections"],
+        heaviest,
+    )
+
+
+def start_memory_logger(interval=MEMORY_LOG_INTERVAL_SECONDS):
+    with _lock:
+        if _state["logger_thread"] is not None:
+            return _state["logger_thread"]
+        if logger.level == logging.NOTSET:
+            logger.setLevel(logging.INFO)
+        # only print ourselves when nothing up the hierarchy (e.g. gunicorn's root config) will
+        if not logger.handlers and not logging.getLogger().handlers:
+            logger.addHandler(logging.StreamHandler())
+
+    def run():
+        while True:
+            time.sleep(interval)
+            log_memory_summary()
+
+    thread = threading.Thread(target=run, name="memory-logger", daemon=True)
+    with _lock:
+        _state["logger_thread"] = thread
+    thread.start()
+    return thread
+
+
+def enable_memory_profiling(app):
+    if not is_enabled():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    reset_baseline()
+    track_callback_allocations(app.server)
+    start_memory_logger()
@@ -0,0 +1,454 @@
+import argparse
+import http.client
+import json
+import logging
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+CALLBACK_PATH = "/_dash-update-component"
+MAX_CHAIN_ROUNDS = 5
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    # nearest-rank: the smallest value with at least pct% of the samples at or below it
+    rank = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+def parse_outputs(output):
+    if output.startswith(".."):
+        parts = output[2:-2].split("...")
+    else:
+        parts = [output]
+    return [tuple(part.rsplit(".", 1)) for part in parts]
+
+
+def callback_label(output):
+    return ",".join(f"{component}.{prop}" for component, prop in parse_outputs(output))
+
+
+def collect_props(node, state):
+    if isinstance(node, list):
+        for child in node:
+            collect_props(child, state)
+        return
+    if not isinstance(node, dict) or "props" not in node:
+        return
+    props = node["props"]
+    component_id = props.get("id")
+    for prop, value in props.items():
+        if component_id is not None and prop != "id":
+            state[(component_id, prop)] = value
+        if isinstance(value, (dict, list)):
+            collect_props(value, state)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.sessions = 0
+        self.skipped = 0
+        self.session_errors = defaultdict(lambda: {"count": 0, "example": None})
+        self.started = time.perf_counter()
+
+    def record(self, label, elapsed, ok):
+        with self.lock:
+            self.latencies[label].append(elapsed)
+            if not ok:
+                self.errors[label] += 1
+
+    def finish_session(self):
+        with self.lock:
+            self.sessions += 1
+
+    def skip_session(self):
+        with self.lock:
+            self.skipped += 1
+
+    def fail_session(self, exc):
+        with self.lock:
+            entry = self.session_errors[type(exc).__name__]
+            entry["count"] += 1
+            entry["example"] = entry["example"] or str(exc)[:200]
+
+    def summary(self):
+        wall = time.perf_counter() - self.started
+        rows = []
+        with self.lock:
+            labels = sorted(self.latencies, key=lambda label: -len(self.latencies[label]))
+            everything = []
+            for label in labels:
+                values = sorted(self.latencies[label])
+                everything.extend(values)
+                rows.append(self._row(label, values, self.errors[label], wall))
+            rows.append(self._row("TOTAL", sorted(everything), sum(self.errors.values()), wall))
+            return {
+                "wall_seconds": wall,
+                "sessions": self.sessions,
+                "failed_sessions": sum(entry["count"] for entry in self.session_errors.values()),
+                "session_errors": {name: dict(entry) for name, entry in self.session_errors.items()},
+                "skipped_sessions": self.skipped,
+                "callbacks": rows,
+            }
+
+    @staticmethod
+    def _row(label, values, errors, wall):
+        count = len(values)
+        return {
+            "callback": label,
+            "requests": count,
+            "throughput_rps": count / wall if wall else 0.0,
+            "error_rate": errors / count if count else 0.0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+
+
+class DashClient:
+    def __init__(self, base_url, recorder, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.secure = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.connection = None
+
+    def _connect(self):
+        factory = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        self.connection = factory(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None):
+        if self.connection is None:
+            self._connect()
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        payload = json.dumps(body).encode() if body is not None else None
+        try:
+            self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            raise
+        return response.status, data
+
+    def timed(self, label, method, path, body=None):
+        started = time.perf_counter()
+        try:
+            status, data = self.request(method, path, body)
+        except (OSError, http.client.HTTPException):
+            self.recorder.record(label, time.perf_counter() - started, ok=False)
+            return None, None
+        self.recorder.record(label, time.perf_counter() - started, ok=status < 400)
+        return status, data
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+class Session:
+    def __init__(self, client, dependencies, rng, think_time):
+        self.client = client
+        self.dependencies = dependencies
+        self.rng = rng
+        self.think_time = think_time
+        self.state = {}
+
+    def load_page(self):
+        status, data = self.client.timed("GET _dash-layout", "GET", "/_dash-layout")
+        if status != 200:
+            return False
+        collect_props(json.loads(data), self.state)
+        initial = [dep for dep in self.dependencies if not dep.get("prevent_initial_call")]
+        self._run_chain(initial, set())
+        return True
+
+    def set_prop(self, component_id, prop, value):
+        self.state[(component_id, prop)] = value
+        changed = {(component_id, prop)}
+        self._run_chain(self._triggered_by(changed), changed)
+        if self.think_time:
+            time.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def _triggered_by(self, changed):
+        return [
+            dep
+            for dep in self.dependencies
+            if any((item["id"], item["property"]) in changed for item in dep["inputs"])
+        ]
+
+    def _run_chain(self, deps, changed):
+        for _ in range(MAX_CHAIN_ROUNDS):
+            if not deps:
+                return
+            # like the renderer, hold back callbacks fed by another callback fired in this round
+            pending_outputs = {output for dep in deps for output in parse_outputs(dep["output"])}
+            ready = [
+                dep for dep in deps
+                if not any((item["id"], item["property"]) in pending_outputs for item in dep["inputs"])
+            ] or deps
+            held = [dep for dep in deps if dep not in ready]
+            updates = set()
+            for dep in ready:
+                updates |= self._fire(dep, changed)
+            changed = changed | updates
+            deps = held + [dep for dep in self._triggered_by(updates) if dep not in held]
+
+    def _fire(self, dep, changed):
+        outputs = [{"id": component, "property": prop} for component, prop in parse_outputs(dep["output"])]
+        inputs = {(item["id"], item["property"]) for item in dep["inputs"]}
+        body = {
+            "output": dep["output"],
+            "outputs": outputs if dep["output"].startswith("..") else outputs[0],
+            "inputs": [dict(item, value=self.state.get((item["id"], item["property"]))) for item in dep["inputs"]],
+            "state": [dict(item, value=self.state.get((item["id"], item["property"]))) for item in dep["state"]],
+            "changedPropIds": [f"{component}.{prop}" for component, prop in changed if (component, prop) in inputs],
+        }
+        status, data = self.client.timed(callback_label(dep["output"]), "POST", CALLBACK_PATH, body)
+        if status != 200 or not data:
+            return set()
+        updated = set()
+        for component, props in json.loads(data).get("response", {}).items():
+            for prop, value in props.items():
+                if self.state.get((component, prop)) != value:
+                    self.state[(component, prop)] = value
+                    updated.add((component, prop))
+        return updated
+
+    def options(self, component_id):
+        return [option["value"] for option in self.state.get((component_id, "options")) or []]
+
+    def toggle(self, component_id, value):
+        current = list(self.state.get((component_id, "value")) or [])
+        if value in current:
+            current.remove(value)
+        else:
+            current.append(value)
+        self.set_prop(component_id, "value", current)
+
+    def visible_countries(self):
+        figure = self.state.get(("world_map", "figure")) or {}
+        countries = []
+        for trace in figure.get("data", []):
+            locations = trace.get("locations")
+            if isinstance(locations, list):
+                countries.extend(locations)
+        return countries
+
+    def click_map(self):
+        countries = self.visible_countries()
+        if not countries:
+            return
+        country = self.rng.choice(countries)
+        self.set_prop("world_map", "clickData", {"points": [{"location": country}]})
+        self.set_prop("summary_close", "n_clicks", (self.state.get(("summary_close", "n_clicks")) or 0) + 1)
+
+    def sweep_slider(self):
+        low = self.state.get(("year_slider", "min")) or 0
+        high = self.state.get(("year_slider", "max")) or 0
+        steps = self.rng.randint(5, 15)
+        start = self.rng.randint(low, max(low, high - steps))
+        for year in range(start, min(high, start + steps) + 1):
+            self.set_prop("year_slider", "value", year)
+
+    def drag_range(self, mode):
+        self.set_prop("year_mode", "value", mode)
+        low = self.state.get(("year_range_slider", "min")) or 0
+        high = self.state.get(("year_range_slider", "max")) or 0
+        for _ in range(self.rng.randint(2, 6)):
+            start = self.rng.randint(low, high)
+            self.set_prop("year_range_slider", "value", [start, self.rng.randint(start, high)])
+        self.set_prop("year_mode", "value", "single")
+
+    def run(self):
+        if not self.load_page():
+            return
+        rng = self.rng
+        regions = [region for region in self.options("region_selector") if region != "all"]
+        for region in rng.sample(regions, k=min(len(regions), rng.randint(1, 2))):
+            self.toggle("region_selector", region)
+        for regime in rng.sample(self.options("democracy_selector"), k=rng.randint(1, 2)):
+            self.toggle("democracy_selector", regime)
+        ideologies = self.options("ideology_selector")
+        for ideology in rng.sample(ideologies, k=rng.randint(1, len(ideologies))):
+            self.toggle("ideology_selector", ideology)
+        self.sweep_slider()
+        for _ in range(rng.randint(1, 3)):
+            self.click_map()
+        if rng.random() < 0.5:
+            self.drag_range(rng.choice(["range", "compare"]))
+            self.click_map()
+        self.toggle("region_selector", rng.choice(regions))
+        self.sweep_slider()
+
+
+def fetch_dependencies(base_url, timeout):
+    client = DashClient(base_url, Recorder(), timeout)
+    try:
+        status, data = client.request("GET", "/_dash-dependencies")
+    finally:
+        client.close()
+    if status != 200:
+        raise RuntimeError(f"GET /_dash-dependencies returned {status}")
+    return [dep for dep in json.loads(data) if not dep.get("clientside_function")]
+
+
+def wait_until_ready(base_url, timeout, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"app process exited with code {process.returncode} before becoming ready; see its stderr above")
+        try:
+            fetch_dependencies(base_url, timeout=2)
+            return
+        except (OSError, RuntimeError, http.client.HTTPException):
+            time.sleep(0.25)
+    raise RuntimeError(f"app at {base_url} did not become ready within {timeout}s")
+
+
+def start_in_process():
+    from werkzeug.serving import make_server
+
+    from app_core import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, create_app().server, threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown, None
+
+
+def start_subprocess(port):
+    # stderr is inherited so start-up failures (bad env, port in use) are visible; per-request logs are muted
+    command = (
+        "import logging; from app_core import create_app; "
+        "logging.getLogger('werkzeug').setLevel(logging.WARNING); "
+        f"create_app().run(host='127.0.0.1', port={port}, debug=False)"
+    )
+    process = subprocess.Popen([sys.executable, "-c", command], stdout=subprocess.DEVNULL)
+
+    def stop():
+        process.terminate()
+        process.wait(timeout=10)
+
+    return f"http://127.0.0.1:{port}", stop, process
+
+
+def run_load(base_url, dependencies, args):
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+    seeds = random.Random(args.seed)
+    seed_lock = threading.Lock()
+
+    def next_seed():
+        with seed_lock:
+            return seeds.random()
+
+    def session_once():
+        if time.monotonic() >= deadline:
+            # arrived while every slot was busy and never started; the server could not keep up
+            recorder.skip_session()
+            return
+        client = DashClient(base_url, recorder, args.timeout)
+        try:
+            Session(client, dependencies, random.Random(next_seed()), args.think).run()
+            recorder.finish_session()
+        except Exception as exc:  # pylint: disable=broad-except
+            # e.g. an HTML error page served with 200, or an unexpected response shape
+            recorder.fail_session(exc)
+        finally:
+            client.close()
+
+    def closed_loop_user():
+        while time.monotonic() < deadline:
+            session_once()
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        if args.rate:
+            # open model: sessions arrive as a Poisson process, at most `concurrency` run at once
+            arrivals = random.Random(args.seed)
+            while time.monotonic() < deadline:
+                futures.append(pool.submit(session_once))
+                time.sleep(arrivals.expovariate(args.rate))
+        else:
+            futures = [pool.submit(closed_loop_user) for _ in range(args.concurrency)]
+    for future in futures:
+        # session failures are recorded above; anything surfacing here is a harness bug
+        future.result()
+    return recorder.summary()
+
+
+def print_report(summary):
+    print(f"\n{summary['sessions']} sessions in {summary['wall_seconds']:.1f}s", end="")
+    if summary["skipped_sessions"]:
+        print(f" ({summary['skipped_sessions']} arrivals never started before the deadline)", end="")
+    print()
+    if summary["failed_sessions"]:
+        print(f"{summary['failed_sessions']} sessions aborted with an error:")
+        for name, entry in sorted(summary["session_errors"].items()):
+            print(f"  {name} x{entry['count']}: {entry['example']}")
+    print()
+    header = f"{'callback':<60} {'reqs':>7} {'req/s':>8} {'err%':>6} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in summary["callbacks"]:
+        print(
+            f"{row['callback'][:60]:<60} {row['requests']:>7} {row['throughput_rps']:>8.1f} "
+            f"{row['error_rate'] * 100:>6.2f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay interaction sessions against the Dash callback endpoint.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="load an already running deployment instead of starting one")
+    target.add_argument("--subprocess", action="store_true", help="start the app with create_app() in a child process")
+    parser.add_argument("--port", type=int, default=8765, help="port for --subprocess (default: 8765)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent sessions (default: 8)")
+    parser.add_argument("--rate", type=float, default=0.0, help="session arrivals per second; 0 runs closed-loop users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to generate load (default: 30)")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between interactions, seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="also write the summary to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stop = process = None
+    if args.url:
+        base_url = args.url
+    elif args.subprocess:
+        base_url, stop, process = start_subprocess(args.port)
+    else:
+        base_url, stop, process = start_in_process()
+    try:
+        wait_until_ready(base_url, timeout=60, process=process)
+        summary = run_load(base_url, fetch_dependencies(base_url, args.timeout), args)
+    finally:
+        if stop is not None:
+            stop()
+    print_report(summary)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()